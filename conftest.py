@@ -0,0 +1,191 @@
+"""
+Pytest configuration - runs the test suite against a shared in-memory SQLite database
+"""
+
+import os
+
+# Must be set before the database module is imported by any test module. Each
+# pytest-xdist worker is its own process and gets its own named database. Always
+# overwritten: an exported LIBRARY_DB_PATH names a real database, which the
+# suite would otherwise empty and overwrite. On-disk tests use file_db instead.
+_worker = os.environ.get('PYTEST_XDIST_WORKER', 'main')
+os.environ['LIBRARY_DB_PATH'] = f'file:librarytest_{_worker}?mode=memory&cache=shared'
+
+import sqlite3
+import pytest
+from contextlib import contextmanager
+from itertools import count
+from datetime import datetime, timedelta
+import database
+from database import get_db_connection, init_database, add_sample_data
+
+# Durability is irrelevant for a throwaway test database, so every connection skips
+# fsync, keeps its journal in RAM, gets an 8 MiB page cache and reads through a
+# memory map. These matter for the on-disk file_db tests. WAL is not used:
+# an in-memory database cannot switch to it, and with synchronous=OFF it would
+# only add -wal/-shm files. locking_mode=EXCLUSIVE is left out: the connection
+# below stays open all session and would lock out the service's own connections.
+database.CONNECTION_PRAGMAS = (
+    'synchronous = OFF',
+    'journal_mode = MEMORY',
+    'temp_store = MEMORY',
+    'cache_size = -8000',
+    'mmap_size = 268435456',
+)
+
+# A shared-cache in-memory database is discarded once its last connection closes,
+# so hold one open for the whole session (service code opens/closes per call).
+_keepalive = get_db_connection()
+
+
+def pytest_unconfigure(config):
+    """Release the in-memory database at the end of the session."""
+    _keepalive.close()
+
+
+@pytest.fixture(scope='session')
+def _schema():
+    """Create the schema and sample data once and keep a snapshot of the result."""
+    init_database()
+    add_sample_data()
+    snapshot = sqlite3.connect(':memory:')
+    _keepalive.backup(snapshot)
+    yield snapshot
+    snapshot.close()
+
+
+@pytest.fixture(autouse=True)
+def _rollback(_schema):
+    """
+    Roll the database back to the seeded snapshot after each test.
+
+    Service functions commit on their own connections, so a transaction held
+    here could not undo their writes; restoring the snapshot does.
+    """
+    yield
+    _schema.backup(_keepalive)
+
+
+@pytest.fixture(scope='session')
+def db_conn(_schema):
+    """
+    The session's open connection to the seeded test database.
+
+    Tests use this for direct reads and writes instead of opening their own
+    connection. It always points at the in-memory database, even under file_db.
+    """
+    return _keepalive
+
+
+@pytest.fixture(scope='session')
+def extend_seed(_schema, db_conn):
+    """
+    Return a context manager that adds rows to the seeded state while it is open.
+
+    populate(conn) runs once in a single transaction and the snapshot that
+    _rollback restores is retaken, so a module can seed its own rows once instead
+    of per test. On exit the database and snapshot go back to the session seed.
+    """
+    @contextmanager
+    def _extend_seed(populate):
+        original = sqlite3.connect(':memory:')
+        _schema.backup(original)
+        with db_conn:
+            populate(db_conn)
+        db_conn.backup(_schema)
+        try:
+            yield
+        finally:
+            original.backup(_schema)
+            original.backup(db_conn)
+            original.close()
+    return _extend_seed
+
+
+@pytest.fixture
+def _clean_db(db_conn):
+    """Empty both tables for tests that need a catalog with no books."""
+    db_conn.execute('DELETE FROM borrow_records')
+    db_conn.execute('DELETE FROM books')
+    db_conn.commit()
+
+
+@pytest.fixture(scope='session')
+def unique_isbn():
+    """
+    Return a helper that builds a 13-digit ISBN no other test in the session reuses.
+
+    Every module draws from this one counter, so books added by different test
+    modules can never collide. The leading 9 keeps them clear of the 978... seeds.
+    """
+    isbn_seq = count(1)
+    def _unique_isbn():
+        return f"9{next(isbn_seq):012d}"
+    return _unique_isbn
+
+
+@pytest.fixture(scope='session')
+def msg_has():
+    """Return a helper that checks a message for any of the given substrings, ignoring case."""
+    def _msg_has(message, *needles):
+        m = message.lower()
+        return any(n in m for n in needles)
+    return _msg_has
+
+
+@pytest.fixture(scope='session')
+def now():
+    """
+    The session's "now", taken once so loan seeding and assertions agree on it.
+
+    Loan-seeding fixtures and make_overdue build their dates from this instead
+    of reading the clock themselves.
+    """
+    return datetime.now().replace(microsecond=0)
+
+
+@pytest.fixture
+def seed_borrows(db_conn):
+    """
+    Return a helper that records active loans directly, bypassing the service.
+
+    Each row is (patron_id, book_id, borrow_date, due_date). All rows are inserted
+    with one executemany and each book loses one available copy, in a single commit.
+    """
+    def _seed_borrows(rows):
+        with db_conn:
+            db_conn.executemany('''
+                INSERT INTO borrow_records (patron_id, book_id, borrow_date, due_date)
+                VALUES (?, ?, ?, ?)
+            ''', rows)
+            db_conn.executemany(
+                'UPDATE books SET available_copies = available_copies - 1 WHERE id = ?',
+                [(row[1],) for row in rows])
+    return _seed_borrows
+
+
+@pytest.fixture
+def make_overdue(db_conn, now):
+    """Return a helper that moves an active loan's due date `days` days into the past."""
+    def _make_overdue(patron_id, book_id, days=5):
+        due_date = (now - timedelta(days=days)).isoformat()
+        with db_conn:
+            db_conn.execute('''
+                UPDATE borrow_records
+                SET due_date = ?
+                WHERE patron_id = ? AND book_id = ? AND return_date IS NULL
+            ''', (due_date, patron_id, book_id))
+    return _make_overdue
+
+
+@pytest.fixture(scope='session')
+def db_path(tmp_path_factory):
+    """Location for an on-disk database, inside a directory pytest cleans up."""
+    return tmp_path_factory.mktemp('lib') / 'library.db'
+
+
+@pytest.fixture
+def file_db(db_path, monkeypatch):
+    """Point the database module at the on-disk database for one test."""
+    monkeypatch.setattr(database, 'DATABASE', str(db_path))
+    return db_path
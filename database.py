@@ -3,21 +3,45 @@ Database module for Library Management System
 Handles all database operations and connections
 """
 
+import os
 import sqlite3
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 
 # Database configuration
-DATABASE = 'library.db'
+# LIBRARY_DB_PATH may name another file or an SQLite URI such as
+# 'file:librarytest?mode=memory&cache=shared' (used by the test suite)
+DATABASE = os.environ.get('LIBRARY_DB_PATH', 'library.db')
+
+# PRAGMA statements run on every new connection, e.g. 'synchronous = OFF'.
+# Empty by default; the test suite uses it to trade durability for speed.
+CONNECTION_PRAGMAS = ()
 
 def get_db_connection():
     """Get a database connection."""
-    conn = sqlite3.connect(DATABASE)
+    conn = sqlite3.connect(DATABASE, uri=DATABASE.startswith('file:'))
     conn.row_factory = sqlite3.Row  # This enables column access by name
+    if CONNECTION_PRAGMAS:
+        # One call for the whole batch instead of one execute() per PRAGMA
+        conn.executescript(''.join(f'PRAGMA {pragma};' for pragma in CONNECTION_PRAGMAS))
     return conn
 
-def init_database():
-    """Initialize the database with required tables."""
+# Databases this process has already created the schema in
+_initialized_databases = set()
+
+# Databases where init_database() set up the books_fts search index
+_fts_databases = set()
+
+def init_database(force: bool = False):
+    """
+    Initialize the database with required tables.
+    
+    The schema is only created once per database per process; pass
+    force=True to run the DDL again.
+    """
+    if DATABASE in _initialized_databases and not force:
+        return
+    
     conn = get_db_connection()
     
     # Create books table
@@ -45,8 +69,75 @@ def init_database():
         )
     ''')
     
+    # Serves both active-loan lookups (patron_id, book_id, return_date IS NULL)
+    # and the full borrowing history by patron_id
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_borrow_patron_book_return
+        ON borrow_records (patron_id, book_id, return_date)
+    ''')
+    
+    # Case-insensitive title order for get_all_books and for title/author searches
+    # too short (< 3 characters) for books_fts, so neither has to sort; longer
+    # searches go through books_fts and sort only the matches. Holds only
+    # columns borrows and returns never change, so they don't rewrite its entries.
+    conn.execute('DROP INDEX IF EXISTS idx_books_title_nocase')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_books_title_author_nocase
+        ON books (title COLLATE NOCASE, author)
+    ''')
+    
+    if _create_books_fts(conn):
+        _fts_databases.add(DATABASE)
+    
     conn.commit()
     conn.close()
+    _initialized_databases.add(DATABASE)
+
+def _create_books_fts(conn) -> bool:
+    """
+    Create the books_fts trigram index over title and author, kept in sync
+    with books by triggers. Returns False if this SQLite build has no FTS5
+    trigram tokenizer, in which case searches scan books directly.
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'books_fts'"
+    ).fetchone()
+    if exists:
+        return True
+    
+    try:
+        conn.execute('''
+            CREATE VIRTUAL TABLE books_fts USING fts5(
+                title, author, content='books', content_rowid='id', tokenize='trigram'
+            )
+        ''')
+    except sqlite3.OperationalError:
+        return False
+    
+    # Only title/author changes touch the index; copy counts change constantly
+    conn.executescript('''
+        CREATE TRIGGER IF NOT EXISTS books_fts_insert AFTER INSERT ON books BEGIN
+            INSERT INTO books_fts (rowid, title, author)
+            VALUES (new.id, new.title, new.author);
+        END;
+        CREATE TRIGGER IF NOT EXISTS books_fts_delete AFTER DELETE ON books BEGIN
+            INSERT INTO books_fts (books_fts, rowid, title, author)
+            VALUES ('delete', old.id, old.title, old.author);
+        END;
+        CREATE TRIGGER IF NOT EXISTS books_fts_update AFTER UPDATE OF title, author ON books BEGIN
+            INSERT INTO books_fts (books_fts, rowid, title, author)
+            VALUES ('delete', old.id, old.title, old.author);
+            INSERT INTO books_fts (rowid, title, author)
+            VALUES (new.id, new.title, new.author);
+        END;
+    ''')
+    # Index any books that were added before the search index existed
+    conn.execute("INSERT INTO books_fts (books_fts) VALUES ('rebuild')")
+    return True
+
+def has_books_fts() -> bool:
+    """True if the current database has the books_fts search index."""
+    return DATABASE in _fts_databases
 
 def add_sample_data():
     """Add sample data to the database if it's empty."""
@@ -61,11 +152,10 @@ def add_sample_data():
             ('1984', 'George Orwell', '9780451524935', 1)
         ]
         
-        for title, author, isbn, copies in sample_books:
-            conn.execute('''
-                INSERT INTO books (title, author, isbn, total_copies, available_copies)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (title, author, isbn, copies, copies))
+        conn.executemany('''
+            INSERT INTO books (title, author, isbn, total_copies, available_copies)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [(title, author, isbn, copies, copies) for title, author, isbn, copies in sample_books])
         
         # Make 1984 unavailable by adding a borrow record
         conn.execute('''
@@ -87,7 +177,7 @@ def add_sample_data():
 def get_all_books() -> List[Dict]:
     """Get all books from the database."""
     conn = get_db_connection()
-    books = conn.execute('SELECT * FROM books ORDER BY title').fetchall()
+    books = conn.execute('SELECT * FROM books ORDER BY title COLLATE NOCASE').fetchall()
     conn.close()
     return [dict(book) for book in books]
 
@@ -199,3 +289,23 @@ def update_borrow_record_return_date(patron_id: str, book_id: int, return_date:
     except Exception as e:
         conn.close()
         return False
+
+def update_borrow_records_returned(patron_id: str, book_ids: List[int], return_date: datetime) -> bool:
+    """Mark several of a patron's active loans returned and restock each book, in one transaction."""
+    placeholders = ', '.join('?' * len(book_ids))
+    conn = get_db_connection()
+    try:
+        conn.execute(f'''
+            UPDATE borrow_records 
+            SET return_date = ? 
+            WHERE patron_id = ? AND book_id IN ({placeholders}) AND return_date IS NULL
+        ''', (return_date.isoformat(), patron_id, *book_ids))
+        conn.execute(f'''
+            UPDATE books SET available_copies = available_copies + 1 WHERE id IN ({placeholders})
+        ''', book_ids)
+        conn.commit()
+        conn.close()
+        return True
+    except Exception as e:
+        conn.close()
+        return False
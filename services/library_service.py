@@ -9,9 +9,14 @@ from .payment_service import PaymentGateway
 from database import (
     get_book_by_id, get_book_by_isbn, get_patron_borrow_count,
     insert_book, insert_borrow_record, update_book_availability,
-    update_borrow_record_return_date, get_all_books, get_patron_borrowed_books, get_db_connection
+    update_borrow_record_return_date, update_borrow_records_returned,
+    get_all_books, get_patron_borrowed_books, get_db_connection, has_books_fts
 )
 
+def _valid_patron(patron_id) -> bool:
+    """True if patron_id is a 6-digit library card ID."""
+    return isinstance(patron_id, str) and len(patron_id) == 6 and patron_id.isdigit()
+
 def add_book_to_catalog(title: str, author: str, isbn: str, total_copies: int) -> Tuple[bool, str]:
     """
     Add a new book to the catalog.
@@ -26,17 +31,20 @@ def add_book_to_catalog(title: str, author: str, isbn: str, total_copies: int) -
     Returns:
         tuple: (success: bool, message: str)
     """
-    # Input validation
-    if not title or not title.strip():
+    # Input validation (strip once; the trimmed values are what get stored)
+    title = title.strip() if title else ''
+    author = author.strip() if author else ''
+    
+    if not title:
         return False, "Title is required."
     
-    if len(title.strip()) > 200:
+    if len(title) > 200:
         return False, "Title must be less than 200 characters."
     
-    if not author or not author.strip():
+    if not author:
         return False, "Author is required."
     
-    if len(author.strip()) > 100:
+    if len(author) > 100:
         return False, "Author must be less than 100 characters."
     
     if len(isbn) != 13:
@@ -51,9 +59,9 @@ def add_book_to_catalog(title: str, author: str, isbn: str, total_copies: int) -
         return False, "A book with this ISBN already exists."
     
     # Insert new book
-    success = insert_book(title.strip(), author.strip(), isbn, total_copies, total_copies)
+    success = insert_book(title, author, isbn, total_copies, total_copies)
     if success:
-        return True, f'Book "{title.strip()}" has been successfully added to the catalog.'
+        return True, f'Book "{title}" has been successfully added to the catalog.'
     else:
         return False, "Database error occurred while adding the book."
 
@@ -70,7 +78,7 @@ def borrow_book_by_patron(patron_id: str, book_id: int) -> Tuple[bool, str]:
         tuple: (success: bool, message: str)
     """
     # Validate patron ID
-    if not patron_id or not patron_id.isdigit() or len(patron_id) != 6:
+    if not _valid_patron(patron_id):
         return False, "Invalid patron ID. Must be exactly 6 digits."
     
     # Check if book exists and is available
@@ -115,7 +123,7 @@ def return_book_by_patron(patron_id: str, book_id: int) -> Tuple[bool, str]:
         tuple: (success: bool, message: str)
     """
     # Input validation
-    if not patron_id or not patron_id.isdigit() or len(patron_id) != 6:
+    if not _valid_patron(patron_id):
         return False, "Invalid patron ID. Must be exactly 6 digits."
     
 
@@ -165,6 +173,50 @@ def return_book_by_patron(patron_id: str, book_id: int) -> Tuple[bool, str]:
     
     return True, f'Book "{book["title"]}" has been successfully returned.'
 
+def return_books_by_patron(patron_id: str, book_ids: List[int]) -> Tuple[bool, str]:
+    """
+    Process the return of several books by one patron.
+    Batched form of R4: either every book is returned or none is.
+    
+    Args:
+        patron_id: 6-digit library card ID
+        book_ids: IDs of the books to return
+        
+    Returns:
+        tuple: (success: bool, message: str)
+    """
+    # Input validation
+    if not _valid_patron(patron_id):
+        return False, "Invalid patron ID. Must be exactly 6 digits."
+    
+    book_ids = list(dict.fromkeys(book_ids))
+    if not book_ids:
+        return False, "No books to return."
+    
+    # Due dates of the patron's active loans, by book
+    due_dates = {borrowed['book_id']: borrowed['due_date'] for borrowed in get_patron_borrowed_books(patron_id)}
+    not_borrowed = [book_id for book_id in book_ids if book_id not in due_dates]
+    if not_borrowed:
+        return False, f"Books not borrowed by this patron: {', '.join(map(str, not_borrowed))}."
+    
+    # Process returns
+    return_date = datetime.now()
+    if not update_borrow_records_returned(patron_id, book_ids, return_date):
+        return False, "Database error occurred while updating return records."
+    
+    # Calculate late fees if applicable: R5 rates and cap apply to each book separately
+    days_overdue = [(return_date.date() - due_dates[book_id].date()).days for book_id in book_ids]
+    days_late = sum(max(days, 0) for days in days_overdue)
+    fee_amount = round(sum(_late_fee_amount(days) for days in days_overdue), 2)
+    
+    if days_late:
+        returned = '1 book' if len(book_ids) == 1 else f'{len(book_ids)} books'
+        return True, f'{returned} returned successfully but {days_late} days late in total. Late fee: ${fee_amount:.2f}'
+    
+    if len(book_ids) == 1:
+        return True, '1 book has been successfully returned.'
+    return True, f'{len(book_ids)} books have been successfully returned.'
+
 def calculate_late_fee_for_book(patron_id: str, book_id: int) -> Dict:
     """
     Calculate late fees for a specific book.
@@ -178,7 +230,7 @@ def calculate_late_fee_for_book(patron_id: str, book_id: int) -> Dict:
         dict: Contains fee amount, days overdue, and status
     """
     # Input validation
-    if not patron_id or not patron_id.isdigit() or len(patron_id) != 6:
+    if not _valid_patron(patron_id):
         return {
             'fee_amount': 0.00,
             'days_overdue': 0,
@@ -223,22 +275,51 @@ def calculate_late_fee_for_book(patron_id: str, book_id: int) -> Dict:
         }
     
     days_overdue = (current_date - due_date).days
+    
+    return {
+        'fee_amount': _late_fee_amount(days_overdue),
+        'days_overdue': days_overdue,
+        'status': 'Late fee calculated'
+    }
 
+def _late_fee_amount(days_overdue: int) -> float:
+    """Late fee for a book that is days_overdue days past due (R5 rates, capped at $15.00)."""
+    if days_overdue <= 0:
+        return 0.00
+    
     # Calculate fee based on days overdue
-    fee_amount = 0.00
     if days_overdue <= 7:
         fee_amount = days_overdue * 0.50  # $0.50 per day for first 7 days
     else:
         fee_amount = (7 * 0.50) + ((days_overdue - 7) * 1.00)  # $1.00 per day after 7 days
     
     # Cap fee at maximum $15.00
-    fee_amount = min(fee_amount, 15.00)
-    
-    return {
-        'fee_amount': round(fee_amount, 2),
-        'days_overdue': days_overdue,
-        'status': 'Late fee calculated'
-    }
+    return round(min(fee_amount, 15.00), 2)
+
+def _partial_match_queries(column: str) -> Tuple[str, str, str]:
+    """Queries for a partial, case-insensitive match on a title or author."""
+    return ('%{}%', f'''
+        SELECT * FROM books
+        WHERE {column} LIKE ? COLLATE NOCASE
+        ORDER BY title COLLATE NOCASE
+    ''', f'''
+        SELECT * FROM books
+        WHERE id IN (SELECT rowid FROM books_fts WHERE {column} LIKE ?)
+        ORDER BY title COLLATE NOCASE
+    ''')
+
+# Search queries per search type, built once:
+# (parameter format, query on books, query through books_fts or None)
+_SEARCH_QUERIES = {
+    'title': _partial_match_queries('title'),
+    'author': _partial_match_queries('author'),
+    # Exact match for ISBN
+    'isbn': ('{}', '''
+        SELECT * FROM books
+        WHERE isbn = ?
+        ORDER BY title
+    ''', None),
+}
 
 def search_books_in_catalog(search_term: str, search_type: str) -> List[Dict]:
     """
@@ -247,7 +328,7 @@ def search_books_in_catalog(search_term: str, search_type: str) -> List[Dict]:
 
     Args:
         search_term: Term to search for
-        search_type: Type of search (title, author, or isbn)
+        search_type: Type of search (title, author, or isbn; any case)
 
     Returns:
         List[Dict]: List of matching books
@@ -257,9 +338,10 @@ def search_books_in_catalog(search_term: str, search_type: str) -> List[Dict]:
         return []
 
     # Validate search type
-    valid_search_types = ['title', 'author', 'isbn']
-    if search_type not in valid_search_types:
+    queries = _SEARCH_QUERIES.get(search_type.lower()) if isinstance(search_type, str) else None
+    if queries is None:
         return []
+    param_format, scan_query, fts_query = queries
 
     # Clean search term
     search_term = search_term.strip()
@@ -268,35 +350,16 @@ def search_books_in_catalog(search_term: str, search_type: str) -> List[Dict]:
     conn = get_db_connection()
 
     try:
-        if search_type == 'isbn':
-            # Exact match for ISBN
-            books = conn.execute('''
-                SELECT * FROM books 
-                WHERE isbn = ?
-                ORDER BY title
-            ''', (search_term,)).fetchall()
-        else:
-            # Partial match for title or author
-            search_pattern = f'%{search_term}%'
-            books = conn.execute(f'''
-                SELECT * FROM books 
-                WHERE {search_type} LIKE ? COLLATE NOCASE
-                ORDER BY title
-            ''', (search_pattern,)).fetchall()
+        # The trigram index answers the same case-insensitive LIKE without
+        # scanning every book; it needs at least 3 characters
+        use_fts = fts_query is not None and has_books_fts() and len(search_term) >= 3
+        books = conn.execute(
+            fts_query if use_fts else scan_query,
+            (param_format.format(search_term),)
+        ).fetchall()
 
         # Convert to list of dictionaries
-        results = []
-        for book in books:
-            results.append({
-                'id': book['id'],
-                'title': book['title'],
-                'author': book['author'],
-                'isbn': book['isbn'],
-                'total_copies': book['total_copies'],
-                'available_copies': book['available_copies']
-            })
-
-        return results
+        return [dict(book) for book in books]
 
     except Exception as e:
         print(f"Search error: {str(e)}")
@@ -317,7 +380,7 @@ def get_patron_status_report(patron_id: str) -> Dict:
         dict: Contains patron's borrowing status and history
     """
     # Input validation
-    if not patron_id or not patron_id.isdigit() or len(patron_id) != 6:
+    if not _valid_patron(patron_id):
         return {
             'error': 'Invalid patron ID. Must be exactly 6 digits.',
             'current_books': [],
@@ -330,17 +393,7 @@ def get_patron_status_report(patron_id: str) -> Dict:
     conn = get_db_connection()
     
     try:
-        # Get currently borrowed books
-        current_books = get_patron_borrowed_books(patron_id)
-        
-        # Calculate total late fees
-        total_fees = 0.00
-        for book in current_books:
-            if book['is_overdue']:
-                fee_info = calculate_late_fee_for_book(patron_id, book['book_id'])
-                total_fees += fee_info['fee_amount']
-        
-        # Get complete borrowing history
+        # One query for the whole history; current loans are the unreturned rows
         history = conn.execute('''
             SELECT 
                 br.*, 
@@ -352,29 +405,39 @@ def get_patron_status_report(patron_id: str) -> Dict:
             WHERE br.patron_id = ?
             ORDER BY br.borrow_date DESC
         ''', (patron_id,)).fetchall()
-
-        # Format borrowing history
+        
+        now = datetime.now()
+        current_books = []
+        total_fees = 0.00
         borrow_history = []
         for record in history:
+            due_date = datetime.fromisoformat(record['due_date'])
+            if not record['return_date']:
+                is_overdue = now > due_date
+                if is_overdue:
+                    total_fees += _late_fee_amount((now.date() - due_date.date()).days)
+                current_books.append({
+                    'book_id': record['book_id'],
+                    'title': record['title'],
+                    'author': record['author'],
+                    'due_date': due_date.strftime('%Y-%m-%d'),
+                    'is_overdue': is_overdue
+                })
             borrow_history.append({
                 'book_id': record['book_id'],
                 'title': record['title'],
                 'author': record['author'],
                 'isbn': record['isbn'],
                 'borrow_date': datetime.fromisoformat(record['borrow_date']).strftime('%Y-%m-%d'),
-                'due_date': datetime.fromisoformat(record['due_date']).strftime('%Y-%m-%d'),
+                'due_date': due_date.strftime('%Y-%m-%d'),
                 'return_date': datetime.fromisoformat(record['return_date']).strftime('%Y-%m-%d') if record['return_date'] else None,
                 'status': 'Returned' if record['return_date'] else 'Borrowed'
             })
+        # Current loans are listed oldest first
+        current_books.reverse()
         
         return {
-            'current_books': [{
-                'book_id': book['book_id'],
-                'title': book['title'],
-                'author': book['author'],
-                'due_date': book['due_date'].strftime('%Y-%m-%d'),
-                'is_overdue': book['is_overdue']
-            } for book in current_books],
+            'current_books': current_books,
             'total_borrowed': len(current_books),
             'total_fees': round(total_fees, 2),
             'borrow_history': borrow_history
@@ -407,7 +470,7 @@ def pay_late_fees(patron_id: str, book_id: int, payment_gateway: PaymentGateway)
         dict: Contains success status and message
     """
     # Validate patron ID format
-    if not patron_id or not patron_id.isdigit() or len(patron_id) != 6:
+    if not _valid_patron(patron_id):
         return {"success": False, "message": "Invalid patron ID"}
     
     # Get book information
@@ -1,40 +1,30 @@
 import pytest
-import sys
-sys.path.insert(0, '../')
 
-from database import init_database, add_sample_data, get_db_connection
 from services.library_service import get_all_books, add_book_to_catalog
 
+
+@pytest.fixture(scope="class")
+def books(_schema):
+    """Fetch the seeded catalog once per class for tests that only read it"""
+    return get_all_books()
+
+
 class TestBookCatalogDisplay:
+    """Read-only catalog checks against the seeded sample data"""
 
-    def setup_method(self):
-        """Initialize database before each test"""
-        init_database()
-        add_sample_data()
-    
-    def teardown_method(self):
-        """Cleanup after each test"""
-        try:
-            conn = get_db_connection()
-            conn.close()
-        except:
-            pass
-    
-    def test_get_all_books_not_empty(self):
+    def test_get_all_books_not_empty(self, books):
         """
         Test that catalog returns books when database is populated
         Expected: List containing at least one book
         """
-        books = get_all_books()
         assert len(books) > 0
         assert isinstance(books, list)
     
-    def test_book_catalog_structure(self):
+    def test_book_catalog_structure(self, books):
         """
         Test that each book entry contains all required fields
         Expected: All required fields present with correct types
         """
-        books = get_all_books()
         required_fields = ['id', 'title', 'author', 'isbn', 'total_copies', 'available_copies']
         
         if len(books) > 0:
@@ -51,150 +41,137 @@ class TestBookCatalogDisplay:
                 assert isinstance(book['total_copies'], int)
                 assert isinstance(book['available_copies'], int)
     
-    def test_available_copies_less_or_equal_total(self):
+    def test_available_copies_less_or_equal_total(self, books):
         """
         Test that available copies is always <= total copies
         Expected: Available copies not exceeding total copies
         """
-        books = get_all_books()
         for book in books:
             assert book['available_copies'] <= book['total_copies']
             assert book['available_copies'] >= 0
     
-    def test_catalog_alphabetical_order(self):
+    def test_catalog_alphabetical_order(self, books):
         """
         Test that books are returned in alphabetical order by title
         Expected: Books sorted alphabetically by title
         """
-        books = get_all_books()
         if len(books) > 1:
             titles = [book['title'] for book in books]
-            sorted_titles = sorted(titles)
-            assert titles == sorted_titles
-    
-    def test_newly_added_book_appears(self):
-        """
-        Test that newly added books appear in catalog
-        Expected: New book present in catalog
-        """
-        # Use unique ISBN to avoid conflicts
-        import random
-        unique_isbn = f"7{str(random.randint(100000000000, 999999999999))}"
-        
-        new_book = {
-            'title': 'New Test Book Unique',
-            'author': 'Test Author',
-            'isbn': unique_isbn,
-            'total_copies': 1
-        }
-        
-        success, _ = add_book_to_catalog(new_book['title'], new_book['author'], 
-                                         new_book['isbn'], new_book['total_copies'])
-        
-        # Only check if add was successful
-        if success:
-            books = get_all_books()
-            found = False
-            for book in books:
-                if (book['title'] == new_book['title'] and 
-                    book['author'] == new_book['author'] and 
-                    book['isbn'] == new_book['isbn']):
-                    found = True
-                    break
-            
-            assert found == True
+            assert all(a.lower() <= b.lower() for a, b in zip(titles, titles[1:]))
     
-    def test_catalog_with_zero_available_copies(self):
+    def test_catalog_with_zero_available_copies(self, books):
         """
         Test display of books with zero available copies
         Expected: Books with zero copies still displayed
         """
-        books = get_all_books()
         unavailable_books = [book for book in books if book['available_copies'] == 0]
         # May or may not have unavailable books depending on sample data
         # Just verify the query doesn't filter them out
         assert isinstance(unavailable_books, list)
     
-    def test_unique_book_ids(self):
+    def test_unique_book_ids(self, books):
         """
         Test that all book IDs in catalog are unique
         Expected: No duplicate IDs
         """
-        books = get_all_books()
         book_ids = [book['id'] for book in books]
         assert len(book_ids) == len(set(book_ids))
     
-    def test_valid_isbn_format(self):
+    def test_valid_isbn_format(self, books):
         """
         Test that all ISBNs in catalog are valid 13-digit numbers
         Expected: All ISBNs are 13 digits
         """
-        books = get_all_books()
         for book in books:
             assert len(book['isbn']) == 13, f"ISBN {book['isbn']} is not 13 digits"
             # May have non-digit ISBNs from previous failed tests
             # Just check length for now
     
-    def test_non_empty_required_fields(self):
+    def test_non_empty_required_fields(self, books):
         """
         Test that no required fields are empty
         Expected: No empty required fields
         """
-        books = get_all_books()
         for book in books:
             assert book['title'].strip() != ""
             assert book['author'].strip() != ""
             assert book['isbn'].strip() != ""
     
-    def test_positive_copy_numbers(self):
+    def test_positive_copy_numbers(self, books):
         """
         Test that copy numbers are non-negative
         Expected: All copy counts >= 0
         """
-        books = get_all_books()
         for book in books:
             assert book['total_copies'] > 0
             assert book['available_copies'] >= 0
 
+
+class TestBookCatalogUpdates:
+    """Catalog checks that add or remove books"""
+
+    def test_newly_added_book_appears(self, unique_isbn):
+        """
+        Test that newly added books appear in catalog
+        Expected: New book present in catalog
+        """
+        # Use unique ISBN to avoid conflicts
+        isbn = unique_isbn()
+        
+        new_book = {
+            'title': 'New Test Book Unique',
+            'author': 'Test Author',
+            'isbn': isbn,
+            'total_copies': 1
+        }
+        
+        success, _ = add_book_to_catalog(new_book['title'], new_book['author'], 
+                                         new_book['isbn'], new_book['total_copies'])
+        
+        # Only check if add was successful
+        if success:
+            catalog = {(b['title'], b['author'], b['isbn']): b for b in get_all_books()}
+            assert (new_book['title'], new_book['author'], new_book['isbn']) in catalog
+
+    def test_catalog_order_ignores_title_case(self, unique_isbn):
+        """
+        Test that a lower-case title sorts by its letters, not before/after all capitals
+        Expected: "apple pie" is listed before "Banana", both after "1984"
+        """
+        for title in ("Banana", "apple pie"):
+            success, message = add_book_to_catalog(title, "Test Author", unique_isbn(), 1)
+            assert success == True, message
+        
+        titles = [book['title'] for book in get_all_books()]
+        
+        assert titles.index("1984") < titles.index("apple pie") < titles.index("Banana")
+        assert all(a.lower() <= b.lower() for a, b in zip(titles, titles[1:]))
+
+    @pytest.mark.usefixtures("_clean_db")
     def test_empty_catalog_after_init(self):
         """
         Test catalog state with fresh database
         Expected: Empty list when no books added
         """
-        from database import get_db_connection
-        
-        # Manually clear the database
-        conn = get_db_connection()
-        conn.execute('DELETE FROM books')
-        conn.execute('DELETE FROM borrow_records')
-        conn.commit()
-        conn.close()
-        
         books = get_all_books()
         assert len(books) == 0
         assert isinstance(books, list)
-    
-    def test_multiple_copies_display(self):
+
+    def test_multiple_copies_display(self, unique_isbn):
         """
         Test display of books with multiple copies
         Expected: Correct total and available copy counts
         """
         # Use unique ISBN to avoid conflicts
-        import random
-        unique_isbn = f"8{str(random.randint(100000000000, 999999999999))}"
+        isbn = unique_isbn()
         
         success, _ = add_book_to_catalog("Multiple Copies Book", "Test Author", 
-                                         unique_isbn, 5)
+                                         isbn, 5)
         
         # Only proceed if add was successful
         if success:
-            books = get_all_books()
-            multi_copy_book = None
-            for book in books:
-                if book['isbn'] == unique_isbn:
-                    multi_copy_book = book
-                    break
-            
-            assert multi_copy_book is not None
+            books_by_isbn = {b['isbn']: b for b in get_all_books()}
+            assert isbn in books_by_isbn
+            multi_copy_book = books_by_isbn[isbn]
             assert multi_copy_book['total_copies'] == 5
-            assert multi_copy_book['available_copies'] == 5
\ No newline at end of file
+            assert multi_copy_book['available_copies'] == 5
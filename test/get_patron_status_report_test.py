@@ -1,77 +1,29 @@
+import json
 import pytest
-import sys
-sys.path.insert(0, '../')
 
-from database import init_database, get_db_connection
 from datetime import datetime, timedelta
-from services.library_service import get_patron_status_report, borrow_book_by_patron
+from services.library_service import get_patron_status_report
 
+
+@pytest.fixture
+def _patron_loans(seed_borrows, now):
+    """Give patron 111111 books 1 and 2, with book 1 overdue"""
+    seed_borrows([
+        ("111111", 1, (now - timedelta(days=34)).isoformat(), (now - timedelta(days=20)).isoformat()),
+        ("111111", 2, now.isoformat(), (now + timedelta(days=14)).isoformat()),
+    ])
+
+
+@pytest.fixture(scope="module")
+def empty_report(_schema):
+    """Status report for patron 999999, who never borrows; computed once per module"""
+    return get_patron_status_report("999999")
+
+
+@pytest.mark.usefixtures("_patron_loans")
 class TestPatronStatusReport:
     """Test suite for R7: Patron Status Report functionality"""
     
-    def setup_method(self):
-        """Setup test environment before each test"""
-        init_database()
-        # Setup test data
-        self._setup_test_data()
-    
-    def _setup_test_data(self):
-        """Create test data for patron status testing"""
-        # Create a patron with multiple borrowed books
-        patron_id = "111111"
-        borrow_book_by_patron(patron_id, 1)  # Borrow first book
-        borrow_book_by_patron(patron_id, 2)  # Borrow second book
-        
-        # Create an overdue book scenario
-        conn = get_db_connection()
-        past_date = (datetime.now() - timedelta(days=20)).isoformat()
-        conn.execute('''
-            UPDATE borrow_records 
-            SET due_date = ? 
-            WHERE patron_id = ? AND book_id = ? AND return_date IS NULL
-        ''', (past_date, patron_id, 1))
-        conn.commit()
-        conn.close()
-    
-    def teardown_method(self):
-        """Cleanup after each test"""
-        try:
-            conn = get_db_connection()
-            conn.close()
-        except:
-            pass
-    
-    def test_patron_status_empty_patron_id(self):
-        """
-        Test: Empty patron ID
-        Expected: Should return error status
-        """
-        result = get_patron_status_report("")
-        
-        assert isinstance(result, dict)
-        # Accept multiple error formats
-        status = result.get('status', result.get('error', ''))
-        message = result.get('message', result.get('error', ''))
-        combined = (str(status) + ' ' + str(message)).lower()
-        
-        assert 'error' in combined or 'invalid' in combined
-        assert 'patron' in combined or 'invalid' in combined
-    
-    def test_patron_status_invalid_patron_id_length(self):
-        """
-        Test: Invalid patron ID length
-        Expected: Should return error for non-6-digit patron ID
-        """
-        result = get_patron_status_report("12345")  # Too short
-        assert isinstance(result, dict)
-        
-        status = result.get('status', result.get('error', ''))
-        message = result.get('message', result.get('error', ''))
-        combined = (str(status) + ' ' + str(message)).lower()
-        
-        assert 'error' in combined or 'invalid' in combined
-        assert '6 digits' in combined or 'invalid patron id' in combined or 'patron' in combined
-    
     def test_patron_status_valid_patron_with_books(self):
         """
         Test: Valid patron ID with borrowed books
@@ -96,12 +48,12 @@ class TestPatronStatusReport:
             # Should have at least some data fields
             assert has_borrowed or has_fees or has_count or has_history
     
-    def test_patron_status_valid_patron_no_books(self):
+    def test_patron_status_valid_patron_no_books(self, empty_report):
         """
         Test: Valid patron ID with no borrowed books
         Expected: Should return status report with zero values
         """
-        result = get_patron_status_report("999999")  # Patron with no borrows
+        result = empty_report  # Patron with no borrows
         
         assert isinstance(result, dict)
         
@@ -189,12 +141,9 @@ class TestPatronStatusReport:
         
         assert isinstance(result, dict)
         
-        # Test JSON serializability
-        import json
+        # Test JSON serializability; dumps succeeding is the whole check
         try:
-            json_str = json.dumps(result, default=str)  # default=str handles datetime
-            parsed = json.loads(json_str)
-            assert isinstance(parsed, dict)
+            json.dumps(result, default=str)  # default=str handles datetime
         except (TypeError, ValueError) as e:
             pytest.fail(f"Result should be JSON serializable: {e}")
     
@@ -269,6 +218,17 @@ class TestPatronStatusReport:
         assert fees <= 30.00  # Maximum for 2 books
         assert fees >= 0.00
 
+    def test_patron_status_overdue_fee_matches_late_fee_rules(self):
+        """
+        Test: Fees owed for the loan seeded 20 days overdue
+        Expected: Capped at $15.00; the on-time loan adds nothing
+        """
+        result = get_patron_status_report("111111")
+        
+        assert result['total_borrowed'] == 2
+        assert [book['is_overdue'] for book in result['current_books']] == [True, False]
+        assert result['total_fees'] == pytest.approx(15.00, abs=0.01)
+
     def test_patron_status_borrowing_history_complete(self):
         """
         Test: Verify borrowing history contains all transactions
@@ -305,12 +265,12 @@ class TestPatronStatusReport:
         assert isinstance(borrowed_books, list)
         assert isinstance(history, list)
 
-    def test_patron_status_no_borrowed_books(self):
+    def test_patron_status_no_borrowed_books(self, empty_report):
         """
         Test: Patron with no borrowed books
         Expected: Empty lists and zero values
         """
-        result = get_patron_status_report("999999")
+        result = empty_report
         
         borrowed_books = result.get('currently_borrowed_books', result.get('current_books', []))
         fees = result.get('total_late_fees_owed', result.get('total_fees', 0.0))
@@ -336,9 +296,10 @@ class TestPatronStatusReport:
             has_overdue_info = any('is_overdue' in book or 'overdue' in str(book).lower() 
                                    for book in borrowed_books)
             # Or check by due date
+            now = datetime.now()
             try:
                 overdue_found = any(
-                    datetime.fromisoformat(book['due_date']) < datetime.now()
+                    datetime.fromisoformat(book['due_date']) < now
                     for book in borrowed_books if 'due_date' in book
                 )
                 assert has_overdue_info or overdue_found
@@ -369,30 +330,28 @@ class TestPatronStatusReport:
         history = result.get('borrowing_history', result.get('borrow_history', []))
         assert isinstance(history, list)
 
-    def test_patron_status_invalid_patron_format(self):
-        """
-        Negative test: Invalid patron ID format
-        Expected: Error status with message
-        """
-        result = get_patron_status_report("12345")  # Too short
-        
-        status = result.get('status', result.get('error', ''))
-        message = result.get('message', result.get('error', ''))
-        combined = (str(status) + ' ' + str(message)).lower()
-        
-        assert 'error' in combined or 'invalid' in combined
-        assert 'patron' in combined or 'invalid' in combined
 
-    def test_patron_status_special_characters(self):
-        """
-        Negative test: Patron ID with special characters
+class TestPatronStatusValidation:
+    """Patron ID validation for R7; rejected before any loans are read, so nothing is seeded"""
+
+    @pytest.mark.parametrize("patron_id,expected", [
+        pytest.param("", ("patron", "invalid"), id="empty"),
+        pytest.param(None, ("patron", "invalid"), id="none"),
+        pytest.param("12345", ("6 digits", "invalid patron id", "patron"), id="too_short"),
+        pytest.param("12345A", ("patron", "invalid"), id="with_letters"),
+        pytest.param("12@456", ("patron", "invalid"), id="special_chars"),
+    ])
+    def test_patron_status_invalid_patron_id(self, patron_id, expected, msg_has):
+        """
+        Negative test: Patron ID that is not exactly 6 digits
         Expected: Error status with message
         """
-        result = get_patron_status_report("12@456")
+        result = get_patron_status_report(patron_id)
         
+        assert isinstance(result, dict)
         status = result.get('status', result.get('error', ''))
         message = result.get('message', result.get('error', ''))
-        combined = (str(status) + ' ' + str(message)).lower()
+        combined = str(status) + ' ' + str(message)
         
-        assert 'error' in combined or 'invalid' in combined
-        assert 'patron' in combined or 'invalid' in combined
\ No newline at end of file
+        assert msg_has(combined, 'error', 'invalid')
+        assert msg_has(combined, *expected)
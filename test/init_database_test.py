@@ -0,0 +1,172 @@
+import pytest
+
+import database
+from services import library_service
+from database import init_database, add_sample_data, get_db_connection, get_all_books
+
+
+@pytest.mark.usefixtures("file_db")
+class TestInitDatabaseOnDisk:
+    """Smoke tests for schema creation and seeding against a real database file"""
+
+    def test_sample_data_persists_across_connections(self, file_db):
+        """
+        Test that seeded books are written to disk
+        Expected: A new connection sees the sample catalog
+        """
+        init_database()
+        add_sample_data()
+
+        assert file_db.exists()
+        titles = [book['title'] for book in get_all_books()]
+        assert "The Great Gatsby" in titles
+        assert "1984" in titles
+
+    def test_add_sample_data_does_not_reseed(self):
+        """
+        Test that seeding an already populated database is a no-op
+        Expected: Book and borrow record counts are unchanged
+        """
+        init_database()
+        add_sample_data()
+        add_sample_data()
+
+        conn = get_db_connection()
+        book_count = conn.execute('SELECT COUNT(*) FROM books').fetchone()[0]
+        record_count = conn.execute('SELECT COUNT(*) FROM borrow_records').fetchone()[0]
+        conn.close()
+
+        assert book_count == 3
+        assert record_count == 1
+
+
+def test_init_database_skips_ddl_unless_forced(tmp_path, monkeypatch):
+    """
+    Test that the schema is only created once per database unless forced
+    Expected: A dropped table comes back only with force=True
+    """
+    monkeypatch.setattr(database, 'DATABASE', str(tmp_path / 'library.db'))
+    init_database()
+
+    conn = get_db_connection()
+    conn.execute('DROP TABLE borrow_records')
+    conn.commit()
+    conn.close()
+
+    def tables():
+        conn = get_db_connection()
+        names = {row['name'] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        conn.close()
+        return names
+
+    init_database()
+    assert 'borrow_records' not in tables()
+
+    init_database(force=True)
+    assert 'borrow_records' in tables()
+
+
+@pytest.mark.parametrize("where", [
+    pytest.param("patron_id = ? AND book_id = ? AND return_date IS NULL", id="active_loan"),
+    pytest.param("patron_id = ? AND return_date IS NULL", id="active_count"),
+    pytest.param("patron_id = ?", id="history"),
+])
+def test_borrow_record_lookups_use_index(where, db_conn):
+    """
+    Test that borrow record lookups by patron are index searches
+    Expected: The query plan searches idx_borrow_patron_book_return
+    """
+    plan = db_conn.execute(
+        f'EXPLAIN QUERY PLAN SELECT * FROM borrow_records WHERE {where}',
+        ("123456", 3)[:where.count('?')]
+    ).fetchall()
+
+    assert any('idx_borrow_patron_book_return' in row['detail'] for row in plan)
+
+
+@pytest.mark.parametrize("search_type", ["title", "author"])
+def test_short_search_reads_title_index_in_order(search_type, db_conn):
+    """
+    Test that the scan query used for short title/author searches walks the title index
+    Expected: The plan scans idx_books_title_author_nocase and has no temp B-tree
+    """
+    _, scan_query, _ = library_service._SEARCH_QUERIES[search_type]
+    plan = db_conn.execute(f'EXPLAIN QUERY PLAN {scan_query}', ('%py%',)).fetchall()
+    details = [row['detail'] for row in plan]
+
+    assert any('idx_books_title_author_nocase' in detail for detail in details)
+    assert not any('TEMP B-TREE' in detail for detail in details)
+
+
+@pytest.mark.parametrize("search_type", ["title", "author"])
+def test_long_search_reads_books_fts(search_type, db_conn):
+    """
+    Test that the books_fts query used for 3+ character searches avoids scanning books
+    Expected: The plan filters books_fts and looks matches up by primary key
+    """
+    if not database.has_books_fts():
+        pytest.skip("SQLite build has no FTS5 trigram tokenizer")
+
+    _, _, fts_query = library_service._SEARCH_QUERIES[search_type]
+    plan = db_conn.execute(f'EXPLAIN QUERY PLAN {fts_query}', ('%python%',)).fetchall()
+    details = [row['detail'] for row in plan]
+
+    assert any('books_fts VIRTUAL TABLE' in detail for detail in details)
+    assert any('INTEGER PRIMARY KEY' in detail for detail in details)
+    assert not any(detail.startswith('SCAN books') and 'books_fts' not in detail for detail in details)
+
+
+def test_isbn_search_is_index_seek(db_conn):
+    """
+    Test that an ISBN search seeks the UNIQUE isbn index
+    Expected: The plan searches on isbn=? instead of scanning books
+    """
+    plan = db_conn.execute(
+        'EXPLAIN QUERY PLAN SELECT * FROM books WHERE isbn = ? ORDER BY title',
+        ("9780743273565",)
+    ).fetchall()
+
+    assert any('(isbn=?)' in row['detail'] for row in plan)
+
+
+def test_books_fts_follows_catalog_changes(db_conn):
+    """
+    Test that the books_fts search index tracks inserts, renames and deletes
+    Expected: A title LIKE on books_fts always matches the current catalog
+    """
+    if not database.has_books_fts():
+        pytest.skip("SQLite build has no FTS5 trigram tokenizer")
+
+    def matches(pattern):
+        rows = db_conn.execute('SELECT rowid FROM books_fts WHERE title LIKE ?', (pattern,))
+        return {row[0] for row in rows}
+
+    with db_conn:
+        book_id = db_conn.execute('''
+            INSERT INTO books (title, author, isbn, total_copies, available_copies)
+            VALUES ('Dune', 'Frank Herbert', '9780441013593', 1, 1)
+        ''').lastrowid
+    assert matches('%dune%') == {book_id}
+
+    with db_conn:
+        db_conn.execute("UPDATE books SET title = 'Children of Dune' WHERE id = ?", (book_id,))
+    assert matches('%children%') == {book_id}
+    assert matches('%dune%') == {book_id}
+
+    with db_conn:
+        db_conn.execute('DELETE FROM books WHERE id = ?', (book_id,))
+    assert matches('%dune%') == set()
+
+
+def test_suite_does_not_use_repository_database():
+    """
+    Canary: the suite must never read or write the committed library.db, or any
+    real database named by an exported LIBRARY_DB_PATH
+    Expected: Connections resolve to the in-memory test database
+    """
+    conn = get_db_connection()
+    db_file = conn.execute('PRAGMA database_list').fetchone()['file']
+    conn.close()
+
+    assert 'mode=memory' in database.DATABASE
+    assert db_file == ''  # in-memory databases have no file
@@ -1,331 +1,275 @@
+import functools
+import time
 import pytest
-import sys
-sys.path.insert(0, '../')
-
-from database import init_database, get_db_connection
-init_database()
 
 from services.library_service import search_books_in_catalog
 
+# Books with several title/author matches; unique ISBNs that won't conflict
+_PYTHON_ROWS = (
+    ("The Book of Python", "John Smith", "5111111111111"),
+    ("Python Programming", "John Smith", "5222222222222"),
+    ("Learning Python", "Jane Smith", "5333333333333"),
+    # Unicode characters in title and author
+    ("El Código Python", "José García", "5444444444444"),
+)
+
+# Large dataset for the performance test; 6xxx ISBNs avoid conflicts with other tests
+_PERF_ROWS = tuple(
+    (f"Performance Test Book {i}", f"Test Author {i}", f"6{i:012d}")
+    for i in range(100)
+)
+
+
+def _assert_book_list(result):
+    """Search results come back as a plain list (possibly empty)"""
+    assert type(result) is list
+
+
+def _populate_search_catalog(conn):
+    """Books shared by the ISBN/multiple-match and performance tests"""
+    conn.executemany('''
+        INSERT OR IGNORE INTO books (title, author, isbn, total_copies, available_copies)
+        VALUES (?, ?, ?, 1, 1)
+    ''', _PYTHON_ROWS + _PERF_ROWS)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _search_catalog(extend_seed):
+    """Seed the extra books once for the whole module, in a single transaction"""
+    with extend_seed(_populate_search_catalog):
+        yield
+
+
+@pytest.fixture(scope="module")
+def search(_search_catalog):
+    """
+    search_books_in_catalog memoized for the module's read-only tests.
+
+    Every test here sees the same catalog, so a repeated (term, type) query
+    returns the same rows and only has to hit the database once.
+    """
+    return functools.lru_cache(maxsize=256)(search_books_in_catalog)
+
+
 class TestSearchBooksValidation:
     """Test search parameter validation"""
     
-    def test_search_empty_search_term(self):
-        """
-        Test: Empty search term
-        Expected: Should return empty list or all books
-        """
-        result = search_books_in_catalog("", "title")
-        
-        assert isinstance(result, list)
-        # Could return empty list or all books - both are valid approaches
-    
-    def test_search_none_search_term(self):
-        """
-        Test: None search term
-        Expected: Should handle gracefully
-        """
-        result = search_books_in_catalog(None, "title")
-        
-        assert isinstance(result, list)
-        # Should not crash, return empty list
-    
-    def test_search_whitespace_only_search_term(self):
-        """
-        Test: Search term with only whitespace
-        Expected: Should handle gracefully, likely return empty results
-        """
-        result = search_books_in_catalog("   ", "title")
+    @pytest.mark.parametrize("search_term,search_type", [
+        pytest.param("", "title", id="empty_search_term"),
+        pytest.param(None, "title", id="none_search_term"),
+        pytest.param("   ", "title", id="whitespace_only_search_term"),
+        pytest.param("test", "invalid_type", id="invalid_search_type"),
+        pytest.param("test", None, id="none_search_type"),
+        pytest.param("gatsby", "TITLE", id="case_insensitive_search_type"),
+    ])
+    def test_search_handles_unusual_parameters(self, search, search_term, search_type):
+        """
+        Test: Empty/None/whitespace terms and invalid, None or upper-case search types
+        Expected: Should handle gracefully and return a list (possibly empty)
+        """
+        result = search(search_term, search_type)
         
-        assert isinstance(result, list)
-    
-    def test_search_invalid_search_type(self):
-        """
-        Test: Invalid search type
-        Expected: Should default to title search or return empty
-        """
-        result = search_books_in_catalog("test", "invalid_type")
-        
-        assert isinstance(result, list)
-    
-    def test_search_none_search_type(self):
-        """
-        Test: None search type
-        Expected: Should default to title search
-        """
-        result = search_books_in_catalog("test", None)
-        
-        assert isinstance(result, list)
-    
-    def test_search_case_insensitive_search_type(self):
-        """
-        Test: Search type with different cases
-        Expected: Should accept TITLE, Title, title, etc.
-        """
-        result = search_books_in_catalog("gatsby", "TITLE")
-        
-        assert isinstance(result, list)
+        _assert_book_list(result)
 
 class TestSearchBooksByTitle:
     """Test title search functionality"""
     
-    def test_search_exact_title_match(self):
+    def test_search_exact_title_match(self, search):
         """
         Test: Exact title match for "The Great Gatsby"
         Expected: Should return exactly one matching book
         """
-        result = search_books_in_catalog("The Great Gatsby", "title")
+        result = search("The Great Gatsby", "title")
         
-        assert len(result) >= 1
-        # Find the Great Gatsby in results
-        gatsby_books = [b for b in result if b['title'] == "The Great Gatsby"]
-        assert len(gatsby_books) >= 1
-        assert gatsby_books[0]['author'] == "F. Scott Fitzgerald"
+        assert any(b['title'] == "The Great Gatsby" and b['author'] == "F. Scott Fitzgerald"
+                   for b in result)
     
-    def test_search_partial_title_match(self):
+    def test_search_partial_title_match(self, search):
         """
         Test: Partial title match (case-insensitive) for "gatsby"
         Expected: Should return "The Great Gatsby"
         """
-        result = search_books_in_catalog("gatsby", "title")
+        result = search("gatsby", "title")
         
-        assert len(result) >= 1
-        assert any("gatsby" in book['title'].lower() for book in result)
-        gatsby_books = [b for b in result if "gatsby" in b['title'].lower()]
-        assert any(b['title'] == "The Great Gatsby" for b in gatsby_books)
+        assert any(b['title'] == "The Great Gatsby" for b in result)
     
-    def test_search_title_case_insensitive(self):
+    def test_search_title_case_insensitive(self, search):
         """
         Test: Case insensitive title search for "GREAT GATSBY"
         Expected: Should find "The Great Gatsby"
         """
-        result = search_books_in_catalog("GREAT GATSBY", "title")
+        result = search("GREAT GATSBY", "title")
         
-        assert len(result) >= 1
         assert any(b['title'] == "The Great Gatsby" for b in result)
     
-    def test_search_numeric_title(self):
+    def test_search_numeric_title(self, search):
         """
         Test: Search for numeric title "1984"
         Expected: Should return the book "1984" by George Orwell
         """
-        result = search_books_in_catalog("1984", "title")
+        result = search("1984", "title")
         
-        assert len(result) >= 1
-        orwell_books = [b for b in result if b['title'] == "1984"]
-        assert len(orwell_books) >= 1
-        assert orwell_books[0]['author'] == "George Orwell"
+        assert any(b['title'] == "1984" and b['author'] == "George Orwell" for b in result)
     
-    def test_search_title_with_partial_word(self):
+    def test_search_title_with_partial_word(self, search):
         """
         Test: Search for "Kill" should find "To Kill a Mockingbird"
         Expected: Should return matching book
         """
-        result = search_books_in_catalog("Kill", "title")
+        result = search("Kill", "title")
         
-        assert len(result) >= 1
-        mockingbird_books = [b for b in result if b['title'] == "To Kill a Mockingbird"]
-        assert len(mockingbird_books) >= 1
-        assert mockingbird_books[0]['author'] == "Harper Lee"
+        assert any(b['title'] == "To Kill a Mockingbird" and b['author'] == "Harper Lee"
+                   for b in result)
     
-    def test_search_nonexistent_title(self):
+    def test_search_type_is_case_insensitive(self, search):
+        """
+        Test: Search type given as "TITLE" or "Title"
+        Expected: Same results as a "title" search
+        """
+        expected = search("gatsby", "title")
+        
+        assert expected
+        assert search("gatsby", "TITLE") == expected
+        assert search("gatsby", "Title") == expected
+    
+    def test_search_nonexistent_title(self, search):
         """
         Test: Search for title that doesn't exist
         Expected: Should return empty list
         """
-        result = search_books_in_catalog("Nonexistent Book Title XYZ", "title")
+        result = search("Nonexistent Book Title XYZ", "title")
         
         assert len(result) == 0
 
 class TestSearchBooksByAuthor:
     """Test author search functionality"""
     
-    def test_search_exact_author_name(self):
+    def test_search_exact_author_name(self, search):
         """
         Test: Exact author name "George Orwell"
         Expected: Should return "1984"
         """
-        result = search_books_in_catalog("George Orwell", "author")
+        result = search("George Orwell", "author")
         
-        assert len(result) >= 1
-        orwell_books = [b for b in result if b['author'] == "George Orwell"]
-        assert len(orwell_books) >= 1
-        assert any(b['title'] == "1984" for b in orwell_books)
+        assert any(b['author'] == "George Orwell" and b['title'] == "1984" for b in result)
     
-    def test_search_partial_author_last_name(self):
+    def test_search_partial_author_last_name(self, search):
         """
         Test: Partial author search "Orwell"
         Expected: Should return book by George Orwell
         """
-        result = search_books_in_catalog("Orwell", "author")
+        result = search("Orwell", "author")
         
-        assert len(result) >= 1
-        assert any("orwell" in book['author'].lower() for book in result)
-        orwell_books = [b for b in result if "orwell" in b['author'].lower()]
-        assert any(b['title'] == "1984" for b in orwell_books)
+        assert any("orwell" in b['author'].lower() and b['title'] == "1984" for b in result)
     
-    def test_search_partial_author_first_name(self):
+    def test_search_partial_author_first_name(self, search):
         """
         Test: Search by first name "Harper"
         Expected: Should return book by Harper Lee
         """
-        result = search_books_in_catalog("Harper", "author")
+        result = search("Harper", "author")
         
-        assert len(result) >= 1
-        harper_books = [b for b in result if "Harper" in b['author']]
-        assert len(harper_books) >= 1
-        assert any(b['title'] == "To Kill a Mockingbird" for b in harper_books)
+        assert any("Harper" in b['author'] and b['title'] == "To Kill a Mockingbird" for b in result)
     
-    def test_search_author_case_insensitive(self):
+    def test_search_author_case_insensitive(self, search):
         """
         Test: Case insensitive author search "f. scott fitzgerald"
         Expected: Should find "The Great Gatsby"
         """
-        result = search_books_in_catalog("f. scott fitzgerald", "author")
+        result = search("f. scott fitzgerald", "author")
         
-        assert len(result) >= 1
-        fitzgerald_books = [b for b in result if b['author'] == "F. Scott Fitzgerald"]
-        assert len(fitzgerald_books) >= 1
-        assert any(b['title'] == "The Great Gatsby" for b in fitzgerald_books)
+        assert any(b['author'] == "F. Scott Fitzgerald" and b['title'] == "The Great Gatsby"
+                   for b in result)
     
-    def test_search_nonexistent_author(self):
+    def test_search_nonexistent_author(self, search):
         """
         Test: Search for author that doesn't exist
         Expected: Should return empty list
         """
-        result = search_books_in_catalog("Nonexistent Author XYZ", "author")
+        result = search("Nonexistent Author XYZ", "author")
         
         assert len(result) == 0
 
 class TestSearchBooksByISBN:
     """Test ISBN search functionality"""
     
-    def setup_method(self):
-        """Setup test data for multiple results"""
-        init_database()  # Reset database to clean state
-        from database import get_db_connection
-        conn = get_db_connection()
-        try:
-            # Use unique ISBNs that won't conflict
-            conn.execute('''
-                INSERT OR IGNORE INTO books (title, author, isbn, total_copies, available_copies)
-                VALUES 
-                ("The Book of Python", "John Smith", "5111111111111", 1, 1),
-                ("Python Programming", "John Smith", "5222222222222", 1, 1),
-                ("Learning Python", "Jane Smith", "5333333333333", 1, 1)
-            ''')
-            conn.commit()
-        except Exception as e:
-            print(f"Setup warning: {e}")
-        finally:
-            conn.close()
-    
-    def teardown_method(self):
-        """Cleanup after each test"""
-        try:
-            conn = get_db_connection()
-            conn.close()
-        except:
-            pass
-    
-    def test_search_exact_isbn_gatsby(self):
+    def test_search_exact_isbn_gatsby(self, search):
         """
         Test: Exact ISBN search for "The Great Gatsby"
         Expected: Should return exactly one book
         """
-        result = search_books_in_catalog("9780743273565", "isbn")
+        result = search("9780743273565", "isbn")
         
-        gatsby_books = [b for b in result if b['isbn'] == "9780743273565"]
-        assert len(gatsby_books) >= 1
-        assert gatsby_books[0]['title'] == "The Great Gatsby"
+        # ISBN search is an exact match in SQL, so no client-side filtering is needed
+        assert [b['title'] for b in result] == ["The Great Gatsby"]
     
-    def test_search_exact_isbn_mockingbird(self):
+    def test_search_exact_isbn_mockingbird(self, search):
         """
         Test: Exact ISBN search for "To Kill a Mockingbird"
         Expected: Should return exactly one book
         """
-        result = search_books_in_catalog("9780061120084", "isbn")
+        result = search("9780061120084", "isbn")
         
-        mockingbird_books = [b for b in result if b['isbn'] == "9780061120084"]
-        assert len(mockingbird_books) >= 1
-        assert mockingbird_books[0]['title'] == "To Kill a Mockingbird"
+        assert [b['title'] for b in result] == ["To Kill a Mockingbird"]
     
-    def test_search_partial_isbn(self):
+    def test_search_partial_isbn(self, search):
         """
         Test: Partial ISBN search "978074327"
         Expected: Should find "The Great Gatsby" (ISBN starts with this)
         """
-        result = search_books_in_catalog("978074327", "isbn")
+        result = search("978074327", "isbn")
         
-        matching_books = [b for b in result if "978074327" in b['isbn']]
         # May not support partial ISBN search - just check it doesn't crash
-        assert isinstance(result, list)
+        _assert_book_list(result)
     
-    def test_search_nonexistent_isbn(self):
+    def test_search_nonexistent_isbn(self, search):
         """
         Test: Search for ISBN that doesn't exist
         Expected: Should return empty list or no matching books
         """
-        result = search_books_in_catalog("9999999999999", "isbn")
+        result = search("9999999999999", "isbn")
         
         # The ISBN 9999999999999 was added in a previous test!
         # Just verify it returns a list
-        assert isinstance(result, list)
+        _assert_book_list(result)
 
-    def test_search_multiple_title_matches(self):
+    def test_search_multiple_title_matches(self, search):
         """
         Test: Search term matching multiple titles
         Expected: Should return all matching books sorted alphabetically
         """
-        result = search_books_in_catalog("Python", "title")
+        result = search("Python", "title")
         
-        assert len(result) >= 3
-        python_books = [b for b in result if "python" in b['title'].lower()]
-        assert len(python_books) >= 3
-        # Verify alphabetical sorting
+        assert sum("python" in b['title'].lower() for b in result) >= 3
+        # Verify case-insensitive alphabetical sorting in one pass over neighbours
         titles = [book['title'] for book in result]
-        assert titles == sorted(titles)
+        assert all(a.lower() <= b.lower() for a, b in zip(titles, titles[1:]))
 
-    def test_search_multiple_author_matches(self):
+    def test_search_multiple_author_matches(self, search):
         """
         Test: Search for author with multiple books
         Expected: Should return all books by author
         """
-        result = search_books_in_catalog("Smith", "author")
+        result = search("Smith", "author")
         
-        smith_books = [b for b in result if "smith" in b['author'].lower()]
-        assert len(smith_books) >= 3
+        assert sum("smith" in b['author'].lower() for b in result) >= 3
 
-    def test_search_with_special_characters(self):
+    def test_search_with_special_characters(self, search):
         """
         Test: Search with special characters and spaces
         Expected: Should handle special characters appropriately
         """
-        result = search_books_in_catalog("Book & Python!", "title")
+        result = search("Book & Python!", "title")
         
-        assert isinstance(result, list)
+        _assert_book_list(result)
 
-    def test_search_with_unicode_characters(self):
+    def test_search_with_unicode_characters(self, search):
         """
         Test: Search with Unicode characters
         Expected: Should handle Unicode characters appropriately
         """
-        # Add a book with Unicode characters
-        from database import get_db_connection
-        conn = get_db_connection()
-        try:
-            conn.execute('''
-                INSERT OR IGNORE INTO books (title, author, isbn, total_copies, available_copies)
-                VALUES ("El Código Python", "José García", "5444444444444", 1, 1)
-            ''')
-            conn.commit()
-        except Exception as e:
-            print(f"Unicode insert warning: {e}")
-        finally:
-            conn.close()
-
-        result = search_books_in_catalog("Código", "title")
-        assert isinstance(result, list)
+        result = search("Código", "title")
+        _assert_book_list(result)
         # May or may not find depending on database collation
         if len(result) > 0:
             assert any("Código" in book['title'] or "codigo" in book['title'].lower() for book in result)
@@ -333,15 +277,15 @@ class TestSearchBooksByISBN:
 class TestSearchBooksEdgeCases:
     """Test search functionality edge cases"""
 
-    def test_search_very_long_search_term(self):
+    def test_search_very_long_search_term(self, search):
         """
         Test: Search with very long search term
         Expected: Should handle gracefully
         """
         long_term = "a" * 500
-        result = search_books_in_catalog(long_term, "title")
+        result = search(long_term, "title")
         
-        assert isinstance(result, list)
+        _assert_book_list(result)
 
     def test_search_with_sql_injection_attempt(self):
         """
@@ -351,82 +295,62 @@ class TestSearchBooksEdgeCases:
         malicious_input = "'; DROP TABLE books; --"
         result = search_books_in_catalog(malicious_input, "title")
         
-        assert isinstance(result, list)
+        _assert_book_list(result)
         # Verify database is still intact by searching for a known book
         all_books = search_books_in_catalog("1984", "title")
         assert len(all_books) >= 1
 
-    def test_search_mixed_type(self):
+    def test_search_mixed_type(self, search):
         """
         Test: Search with numeric and text mixed
         Expected: Should handle mixed content appropriately
         """
-        result = search_books_in_catalog("Python 3", "title")
-        assert isinstance(result, list)
+        result = search("Python 3", "title")
+        _assert_book_list(result)
 
-    def test_search_results_structure(self):
+    def test_search_results_structure(self, search):
         """
         Test: Verify search results contain all required fields
         Expected: Each result should have all catalog display fields
         """
-        result = search_books_in_catalog("1984", "title")
-        required_fields = ['id', 'title', 'author', 'isbn', 'total_copies', 'available_copies']
+        result = search("1984", "title")
+        required_fields = frozenset(('id', 'title', 'author', 'isbn', 'total_copies', 'available_copies'))
         
-        if len(result) > 0:
-            for book in result:
-                assert all(field in book for field in required_fields)
-                assert isinstance(book['id'], int)
-                assert isinstance(book['total_copies'], int)
-                assert isinstance(book['available_copies'], int)
+        for book in result:
+            assert required_fields <= book.keys()
+            assert all(isinstance(book[field], int) for field in ('id', 'total_copies', 'available_copies'))
+
+    @pytest.mark.parametrize("term, search_type", [
+        ("python", "title"),
+        ("GREAT GATSBY", "title"),
+        ("Great%Gatsby", "title"),
+        ("Test Author 1", "author"),
+        ("Lee", "author"),
+    ])
+    def test_search_same_results_without_fts(self, term, search_type, monkeypatch):
+        """
+        Test: Searches through the books_fts index match a plain LIKE scan
+        Expected: Identical results with the index switched off
+        """
+        with_fts = search_books_in_catalog(term, search_type)
+        monkeypatch.setattr("services.library_service.has_books_fts", lambda: False)
+
+        assert search_books_in_catalog(term, search_type) == with_fts
 
 class TestSearchPerformance:
     """Test search functionality performance with large dataset"""
 
-    def setup_method(self):
-        """Setup large dataset for performance testing"""
-        init_database()  # Reset to clean state
-        from database import get_db_connection
-        conn = get_db_connection()
-        try:
-            # Add 100 sample books with unique ISBNs
-            for i in range(100):
-                # Use 6xxx format to avoid conflicts with other tests
-                isbn = f"6{str(i).zfill(12)}"
-                conn.execute('''
-                    INSERT OR IGNORE INTO books (title, author, isbn, total_copies, available_copies)
-                    VALUES (?, ?, ?, 1, 1)
-                ''', (
-                    f"Performance Test Book {i}",
-                    f"Test Author {i}",
-                    isbn
-                ))
-            conn.commit()
-        except Exception as e:
-            print(f"Performance setup warning: {e}")
-        finally:
-            conn.close()
-    
-    def teardown_method(self):
-        """Cleanup after test"""
-        try:
-            conn = get_db_connection()
-            conn.close()
-        except:
-            pass
-
     def test_search_large_dataset(self):
         """
         Test: Search performance with large dataset
         Expected: Should return results quickly and correctly
         """
-        import time
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         
         result = search_books_in_catalog("Performance Test", "title")
         
-        end_time = time.time()
-        search_time = end_time - start_time
+        search_time_ns = time.perf_counter_ns() - start_ns
         
         # Should find many test books (may not be exactly 100 due to database state)
         assert len(result) >= 50  # Relaxed assertion
-        assert search_time < 2.0  # Should complete within 2 seconds (relaxed)
\ No newline at end of file
+        assert search_time_ns < 2_000_000_000  # Should complete within 2 seconds (relaxed)
\ No newline at end of file